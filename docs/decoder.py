@@ -13,153 +13,447 @@ Usage:
 Data Format:
 - Piezo: 4 channels, batched samples, int16 values
 - Temp/Hum: Single reading, int16 temperature, uint16 humidity
+
+Optional (used when installed):
+- numpy: vectorized piezo decode
+- orjson: faster JSON parsing
 """
 
 import base64
+import mmap
+import queue
+import re
 import struct
-import json
 import sys
 import argparse
+import os
+import stat
+import functools
+import threading
+import time
+from array import array
 from datetime import datetime
 
-def decode_piezo_data(base64_data):
+# Optional accelerators, imported on first use (see _numpy() / _json_loads())
+_np = None     # numpy module, or False if not installed
+_loads = None  # orjson.loads, or json.loads as fallback
+
+# Sentinel written by the ESP32 for invalid/uninitialized samples (0x8000)
+INVALID_SAMPLE = -32768
+
+# Raw sensor values are stored in hundredths (centimV, centi-°C, centi-%)
+RAW_SCALE = 0.01
+
+_BANNER = '=' * 60
+
+# Precompiled binary layouts ('<' = little-endian)
+_PIEZO_HDR = struct.Struct('<IHBB')  # I=uint32, H=uint16, B=uint8, B=uint8
+_TH_MSG = struct.Struct('<IhH')      # I=uint32, h=int16, H=uint16
+
+# Serial log line carrying a JSON envelope, e.g. "[Piezo] JSON: {...}"
+_JSON_RE = re.compile(r'\[(?:Piezo|TempHum)\] JSON:\s*(.+)$')
+_JSON_RE_B = re.compile(rb'\[(?:Piezo|TempHum)\] JSON:\s*(.+)$')  # same, for raw file lines
+# Serial log prefixes echoed for debugging
+_DEBUG_TAGS = ('[Modem]', '[TimeSync]', '[Setup]', '[Core', '[Piezo]', '[TempHum]')
+
+# Serial mode: longest partial line kept while waiting for its newline (bytes)
+SERIAL_MAX_LINE = 64 * 1024
+
+# File mode: large buffered reads (kernel readahead overlaps disk I/O with decoding)
+READ_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+# The MQTT decoder thread decodes bursts of up to this many messages, waiting at most this long (s)
+MQTT_BATCH_SIZE = 16
+MQTT_BATCH_WINDOW = 0.005
+
+def _numpy():
+    """Import numpy on first use; returns None if it is not installed"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+def _json_loads(json_str):
+    """Parse JSON with orjson when available, stdlib json otherwise"""
+    global _loads
+    if _loads is None:
+        try:
+            import orjson
+            _loads = orjson.loads
+        except ImportError:
+            import json
+            _loads = json.loads
+    return _loads(json_str)
+
+def _tolist(values):
+    """Plain Python lists from an ndarray or the pure-Python fallback (already lists)"""
+    return values if isinstance(values, list) else values.tolist()
+
+@functools.lru_cache(maxsize=256)
+def _iso(timestamp):
+    """ISO-8601 local time for a Unix timestamp (cached, timestamps repeat across batches)"""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+@functools.lru_cache(maxsize=16)
+def _sample_offsets_ms(num_samples, sample_interval_ms):
+    """Per-sample time offsets ndarray for a batch shape (cached, read-only; batch layout is firmware-fixed)"""
+    np = _numpy()
+    offsets = np.arange(num_samples, dtype=np.int64) * sample_interval_ms
+    offsets.flags.writeable = False
+    return offsets
+
+def _timestamps_ms(base_timestamp, num_samples, sample_interval_ms):
+    """Per-sample timestamps (ms) of a piezo batch: int64 ndarray, or a list without numpy"""
+    if _numpy() is None:
+        return [base_timestamp * 1000 + s * sample_interval_ms for s in range(num_samples)]
+    return base_timestamp * 1000 + _sample_offsets_ms(num_samples, sample_interval_ms)
+
+def _read_piezo_samples(binary_data, num_channels, num_samples):
+    """
+    Hot bytes -> int16 transform for a piezo batch
+    Returns: raw int16 [channels, samples] as a zero-copy ndarray view,
+    or as lists of lists when numpy is not installed
+    """
+    np = _numpy()
+    if np is None:
+        # Pure-Python fallback: one array('h') pass, then split per channel
+        size = 2 * num_channels * num_samples
+        if len(binary_data) < 8 + size:
+            raise ValueError("buffer is smaller than requested size")
+        samples = array('h')
+        samples.frombytes(binary_data[8:8 + size])
+        if sys.byteorder == 'big':
+            samples.byteswap()
+        return [samples[ch * num_samples:(ch + 1) * num_samples].tolist() for ch in range(num_channels)]
+    
+    # Read sensor values (2 bytes per value, signed int16) in one pass
+    return np.frombuffer(
+        binary_data, dtype='<i2', offset=8, count=num_channels * num_samples
+    ).reshape(num_channels, num_samples)
+
+def _decode_piezo_core(binary_data, num_channels, num_samples):
+    """
+    Piezo samples plus their invalid mask
+    Returns: (raw int16 [channels, samples], invalid bool [channels, samples])
+    """
+    raw = _read_piezo_samples(binary_data, num_channels, num_samples)
+    
+    # Filter out invalid sentinel value (-32768 = 0x8000)
+    if isinstance(raw, list):
+        return raw, [[value == INVALID_SAMPLE for value in row] for row in raw]
+    return raw, (raw == INVALID_SAMPLE)
+
+def _channel_summary(raw, invalid_mask, num_samples):
+    """
+    Per-channel valid sample count and first/last valid raw value
+    Returns: (valid_counts, first, last) lists; first/last are 0 for channels with no valid samples
+    """
+    np = _numpy()
+    if np is None:
+        valid_rows = [[value for value, bad in zip(row, bad_row) if not bad]
+                      for row, bad_row in zip(raw, invalid_mask)]
+        return ([len(row) for row in valid_rows],
+                [row[0] if row else 0 for row in valid_rows],
+                [row[-1] if row else 0 for row in valid_rows])
+    
+    # Computed for all channels at once
+    valid = ~invalid_mask
+    valid_counts = np.count_nonzero(valid, axis=1).tolist()
+    if not num_samples:
+        return valid_counts, [0] * len(valid_counts), [0] * len(valid_counts)
+    
+    rows = np.arange(valid.shape[0])
+    first = raw[rows, valid.argmax(axis=1)].tolist()
+    last = raw[rows, num_samples - 1 - valid[:, ::-1].argmax(axis=1)].tolist()
+    return valid_counts, first, last
+
+def _piezo_result(header, raw, invalid_mask):
+    """Build the decoded piezo batch dict from its header and sample arrays"""
+    base_timestamp, sample_interval_ms, num_samples, num_channels = header
+    
+    timestamps_ms = _timestamps_ms(base_timestamp, num_samples, sample_interval_ms)
+    
+    return {
+        'type': 'piezo',
+        'base_timestamp': base_timestamp,
+        'sample_interval_ms': sample_interval_ms,
+        'num_samples': num_samples,
+        'num_channels': num_channels,
+        'raw_i16': raw,                 # int16 centimV [channels, samples]
+        'scale_mV': RAW_SCALE,          # raw_i16 * scale_mV = mV
+        'timestamps_ms': timestamps_ms, # int64 [samples]
+        'invalid_mask': invalid_mask    # bool [channels, samples]
+    }
+
+def _print_piezo(result, binary_size):
+    """Print the batch info and per-channel summary of a decoded piezo batch"""
+    base_timestamp = result['base_timestamp']
+    num_samples = result['num_samples']
+    
+    lines = [
+        f"\n{_BANNER}",
+        f"[Piezo] Batch Info:",
+        f"  Base Timestamp: {base_timestamp} ({_iso(base_timestamp)})",
+        f"  Sample Interval: {result['sample_interval_ms']}ms",
+        f"  Samples per Channel: {num_samples}",
+        f"  Channels: {result['num_channels']}",
+        f"  Binary Size: {binary_size} bytes"
+    ]
+    
+    # Summary per channel (skip invalid values)
+    valid_counts, first, last = _channel_summary(result['raw_i16'], result['invalid_mask'], num_samples)
+    for ch, (valid_count, first_raw, last_raw) in enumerate(zip(valid_counts, first, last)):
+        if valid_count:
+            lines.append(f"  Channel {ch + 1}: {first_raw * RAW_SCALE:.2f}mV -> {last_raw * RAW_SCALE:.2f}mV ({valid_count}/{num_samples} valid samples)")
+        else:
+            lines.append(f"  Channel {ch + 1}: No valid samples")
+    
+    # One write for the whole batch
+    sys.stdout.write('\n'.join(lines) + '\n')
+
+def decode_piezo_data(binary_data, verbose=True):
     """
-    Decode Piezo sensor batch data
+    Decode Piezo sensor batch data (already Base64-decoded, any bytes-like object)
     Binary format (little-endian):
     - uint32_t base_timestamp (4 bytes) - seconds
     - uint16_t sample_interval_ms (2 bytes)
     - uint8_t num_samples (1 byte)
     - uint8_t num_channels (1 byte)
     - int16_t values[num_channels * num_samples] (2 bytes each)
+    Set verbose=False to skip printing the batch summary
+    Arrays are numpy ndarrays (raw_i16 is a view over binary_data, not a copy);
+    without numpy they are plain lists
     """
-    # Decode Base64 to bytes
-    binary_data = base64.b64decode(base64_data)
+    # Byte view over the payload: header and samples are read in place, no slices copied
+    mv = memoryview(binary_data).cast('B')
     
     # Read header (8 bytes total)
-    base_timestamp, sample_interval_ms, num_samples, num_channels = struct.unpack(
-        '<IHBB',  # '<' = little-endian, I=uint32, H=uint16, B=uint8, B=uint8
-        binary_data[:8]
-    )
+    header = _PIEZO_HDR.unpack_from(mv, 0)
+    num_samples, num_channels = header[2], header[3]
     
-    print(f"\n{'='*60}")
-    print(f"[Piezo] Batch Info:")
-    print(f"  Base Timestamp: {base_timestamp} ({datetime.fromtimestamp(base_timestamp).isoformat()})")
-    print(f"  Sample Interval: {sample_interval_ms}ms")
-    print(f"  Samples per Channel: {num_samples}")
-    print(f"  Channels: {num_channels}")
-    print(f"  Binary Size: {len(binary_data)} bytes")
-    
-    # Read sensor values (2 bytes per value, signed int16)
-    values = []
-    offset = 8
-    
-    for ch in range(num_channels):
-        channel_data = []
-        for s in range(num_samples):
-            raw_value = struct.unpack('<h', binary_data[offset:offset+2])[0]  # signed int16
-            voltage_mv = raw_value / 100.0  # Convert from centimV to mV
-            timestamp_ms = base_timestamp * 1000 + (s * sample_interval_ms)
-            
-            # Filter out invalid sentinel value (-32768 = 0x8000)
-            if raw_value == -32768:
-                voltage_mv = None  # Mark as invalid
-            
-            channel_data.append({
-                'sample': s,
-                'timestamp_ms': timestamp_ms,
-                'value_mV': round(voltage_mv, 2) if voltage_mv is not None else 'INVALID'
-            })
-            offset += 2
+    result = _piezo_result(header, *_decode_piezo_core(mv, num_channels, num_samples))
+    
+    if verbose:
+        _print_piezo(result, mv.nbytes)
+    
+    return result
+
+def decode_piezo_batch(payloads):
+    """
+    Decode several complete piezo payloads without printing
+    Payloads with the same (channels, samples) shape are stacked into one
+    (K, channels, samples) array and the sentinel mask is computed in one call;
+    only that compare is batched, and stacking copies the samples (raw_i16 is
+    not a view over the payload here, unlike decode_piezo_data).
+    Returns results in payload order, as decode_piezo_data(..., verbose=False) would
+    """
+    views = [memoryview(payload).cast('B') for payload in payloads]
+    headers = [_PIEZO_HDR.unpack_from(mv, 0) for mv in views]
+    
+    np = _numpy()
+    if np is None:
+        return [_piezo_result(header, *_decode_piezo_core(mv, header[3], header[2]))
+                for mv, header in zip(views, headers)]
+    
+    # Group payload indices by shape
+    groups = {}
+    for i, header in enumerate(headers):
+        groups.setdefault((header[3], header[2]), []).append(i)
+    
+    results = [None] * len(payloads)
+    for (num_channels, num_samples), indices in groups.items():
+        if len(indices) == 1:
+            # Nothing to stack: keep the zero-copy view
+            i = indices[0]
+            results[i] = _piezo_result(headers[i], *_decode_piezo_core(views[i], num_channels, num_samples))
+            continue
         
-        values.append({
+        raw = np.stack([_read_piezo_samples(views[i], num_channels, num_samples) for i in indices])
+        invalid_mask = (raw == INVALID_SAMPLE)
+        for k, i in enumerate(indices):
+            results[i] = _piezo_result(headers[i], raw[k], invalid_mask[k])
+    return results
+
+def _piezo_complete(binary_data):
+    """True if a piezo payload holds its full header and all samples it declares"""
+    if len(binary_data) < _PIEZO_HDR.size:
+        return False
+    _, _, num_samples, num_channels = _PIEZO_HDR.unpack_from(binary_data, 0)
+    return len(binary_data) >= _PIEZO_HDR.size + 2 * num_channels * num_samples
+
+def as_float(result):
+    """
+    Convert a decoded piezo batch to float32 millivolts
+    Invalid samples become NaN (lists of floats when numpy is not installed)
+    """
+    np = _numpy()
+    if np is None:
+        return [[float('nan') if bad else value * result['scale_mV'] for value, bad in zip(row, bad_row)]
+                for row, bad_row in zip(result['raw_i16'], result['invalid_mask'])]
+    
+    value_mv = result['raw_i16'].astype(np.float32) * np.float32(result['scale_mV'])
+    value_mv[result['invalid_mask']] = np.nan
+    return value_mv
+
+def to_records(result):
+    """
+    Expand a decoded piezo batch into per-sample dicts (for printing/JSON)
+    Returns: [{'channel': n, 'data': [{'sample', 'timestamp_ms', 'value_mV'}, ...]}, ...]
+    """
+    timestamps = _tolist(result['timestamps_ms'])
+    records = []
+    for ch, (raw_row, invalid_row) in enumerate(zip(_tolist(result['raw_i16']), _tolist(result['invalid_mask']))):
+        records.append({
             'channel': ch + 1,
-            'data': channel_data
+            'data': [
+                {
+                    'sample': s,
+                    'timestamp_ms': timestamps[s],
+                    # centimV / 100 is already the closest float to 2 decimals
+                    'value_mV': 'INVALID' if bad else raw_value / 100.0
+                }
+                for s, (raw_value, bad) in enumerate(zip(raw_row, invalid_row))
+            ]
         })
-    
-    # Print summary (skip invalid values)
-    for ch in values:
-        valid_samples = [s for s in ch['data'] if s['value_mV'] != 'INVALID']
-        if valid_samples:
-            first = valid_samples[0]
-            last = valid_samples[-1]
-            print(f"  Channel {ch['channel']}: {first['value_mV']}mV -> {last['value_mV']}mV ({len(valid_samples)}/{len(ch['data'])} valid samples)")
-        else:
-            print(f"  Channel {ch['channel']}: No valid samples")
-    
-    return {
-        'type': 'piezo',
-        'base_timestamp': base_timestamp,
-        'sample_interval_ms': sample_interval_ms,
-        'num_samples': num_samples,
-        'num_channels': num_channels,
-        'channels': values
-    }
+    return records
 
-def decode_temphum_data(base64_data):
+def decode_temphum_data(binary_data, verbose=True):
     """
-    Decode Temperature/Humidity data
+    Decode Temperature/Humidity data (already Base64-decoded, any bytes-like object)
     Binary format (little-endian):
     - uint32_t timestamp (4 bytes) - seconds
     - int16_t temperature (2 bytes) - temp * 100
     - uint16_t humidity (2 bytes) - humidity * 100
     Total: 8 bytes
+    Set verbose=False to skip printing the reading
     """
-    # Decode Base64 to bytes
-    binary_data = base64.b64decode(base64_data)
-    
     # Read fields
-    timestamp, temp_raw, hum_raw = struct.unpack('<IhH', binary_data)
+    timestamp, temp_raw, hum_raw = _TH_MSG.unpack(binary_data)
     
     temperature = temp_raw / 100.0
     humidity = hum_raw / 100.0
     
-    print(f"\n{'='*60}")
-    print(f"[TempHum] Reading:")
-    print(f"  Timestamp: {timestamp} ({datetime.fromtimestamp(timestamp).isoformat()})")
-    print(f"  Temperature: {temperature:.2f}°C")
-    print(f"  Humidity: {humidity:.2f}%")
-    print(f"  Binary Size: {len(binary_data)} bytes")
+    if verbose:
+        print(f"\n{_BANNER}")
+        print(f"[TempHum] Reading:")
+        print(f"  Timestamp: {timestamp} ({_iso(timestamp)})")
+        print(f"  Temperature: {temperature:.2f}°C")
+        print(f"  Humidity: {humidity:.2f}%")
+        print(f"  Binary Size: {len(binary_data)} bytes")
     
     return {
         'type': 'temp_hum',
         'timestamp': timestamp,
         'temperature': temperature,
-        'humidity': humidity
+        'humidity': humidity,
+        'temperature_raw': temp_raw,    # int16 centi-°C
+        'humidity_raw': hum_raw         # uint16 centi-%
     }
 
-def process_json_message(json_str):
+def _b64_decoded_len(base64_data):
+    """Decoded size of a Base64 string, computed from its length and padding"""
+    n = len(base64_data)
+    padding = min(2, n - len(base64_data.rstrip('=')))
+    return max(0, (n // 4) * 3 - padding)
+
+def _decode_b64_payload(base64_data):
+    """Base64-decode a sensor payload, rejecting ones too short for any message type"""
+    # Both message types are at least 8 bytes (piezo header / temp-hum reading)
+    size = _b64_decoded_len(base64_data)
+    if size < _TH_MSG.size:
+        raise ValueError(f"payload too short ({size} bytes)")
+    return base64.b64decode(base64_data, validate=False)
+
+def _decode_binary(binary_data, verbose=True):
+    """Decode a Base64-decoded payload, determining type based on size"""
+    if len(binary_data) == 8:
+        # Temperature/Humidity data
+        return decode_temphum_data(binary_data, verbose)
+    else:
+        # Piezo data
+        return decode_piezo_data(binary_data, verbose)
+
+def _print_envelope(data):
+    print(f"\nJSON Message:")
+    print(f"  Timestamp: {data.get('ts')}")
+    print(f"  Time Interval: {data.get('time_interval')}ms")
+
+def _print_error(error, json_str):
+    print(f"Error decoding message: {error}")
+    print(f"Raw data: {json_str}")
+
+def process_json_message(json_str, verbose=True):
     """
     Process JSON message from ESP32
     Expected format: {"ts": ..., "time_interval": ..., "base64_sensordata": "..."}
+    Set verbose=False to decode without printing (errors are still reported)
+    """
+    # Single path for parsing, decoding and reporting: a batch of one
+    return process_json_batch([json_str], verbose)[0]
+
+def process_json_batch(json_strs, verbose=True, labels=None):
     """
+    Process several JSON messages from ESP32 (see process_json_message)
+    Complete piezo payloads are decoded together (see decode_piezo_batch);
+    each message is reported and returned in order, as if decoded on its own.
+    labels: optional lines printed before each message's output
+    Output is printed from the calling thread; call from one thread at a time
+    (as the MQTT decoder thread does) to keep messages whole and in order.
+    """
+    # Parse all envelopes first, without printing
+    unparsed = object()
+    parsed = []
+    for json_str in json_strs:
+        data, binary_data, error = unparsed, None, None
+        try:
+            data = _json_loads(json_str)
+            binary_data = _decode_b64_payload(data.get('base64_sensordata', ''))
+        except Exception as e:
+            error = e
+        parsed.append((data, binary_data, error))
+    
+    # One batched decode for every well-formed piezo payload
+    piezo = [i for i, (_, binary_data, error) in enumerate(parsed)
+             if error is None and len(binary_data) != 8 and _piezo_complete(binary_data)]
     try:
-        data = json.loads(json_str)
-        
-        print(f"\nJSON Message:")
-        print(f"  Timestamp: {data.get('ts')}")
-        print(f"  Time Interval: {data.get('time_interval')}ms")
-        
-        base64_data = data.get('base64_sensordata', '')
-        
-        # Try to determine type based on size
-        binary_size = len(base64.b64decode(base64_data))
-        
-        if binary_size == 8:
-            # Temperature/Humidity data
-            return decode_temphum_data(base64_data)
-        else:
-            # Piezo data
-            return decode_piezo_data(base64_data)
+        decoded = dict(zip(piezo, decode_piezo_batch([parsed[i][1] for i in piezo])))
+    except Exception:
+        # Nothing printed yet: fall back to decoding each message on its own below
+        decoded = {}
+    
+    # Report in message order
+    results = []
+    for i, (json_str, (data, binary_data, error)) in enumerate(zip(json_strs, parsed)):
+        if labels:
+            print(labels[i])
+        try:
+            if data is unparsed:
+                raise error
+            if verbose:
+                _print_envelope(data)
+            if error is not None:
+                raise error
             
-    except Exception as e:
-        print(f"Error decoding message: {e}")
-        print(f"Raw data: {json_str}")
-        return None
+            if i in decoded:
+                result = decoded[i]
+                if verbose:
+                    _print_piezo(result, len(binary_data))
+            else:
+                result = _decode_binary(binary_data, verbose)
+        except Exception as e:
+            _print_error(e, json_str)
+            result = None
+        results.append(result)
+    return results
 
 def interactive_mode():
     """Interactive mode - paste JSON data"""
     print("ESP32 Sensor Data Decoder - Interactive Mode")
-    print("=" * 60)
+    print(_BANNER)
     print("Paste JSON data (or 'quit' to exit):\n")
     
     while True:
@@ -171,10 +465,9 @@ def interactive_mode():
                 continue
                 
             # Check if it's a JSON line from serial output
-            if '[Piezo] JSON:' in line or '[TempHum] JSON:' in line:
-                # Extract JSON part
-                json_part = line.split('JSON:', 1)[1].strip()
-                process_json_message(json_part)
+            m = _JSON_RE.search(line)
+            if m:
+                process_json_message(m.group(1))
             else:
                 # Try to process as JSON directly
                 process_json_message(line)
@@ -189,21 +482,32 @@ def file_mode(filename):
     """Read and decode data from file"""
     print(f"ESP32 Sensor Data Decoder - File Mode")
     print(f"Reading from: {filename}")
-    print("=" * 60)
+    print(_BANNER)
+    
+    def handle_line(line):
+        line = line.strip()
+        if not line:
+            return
+        
+        # Check if it's a JSON line from serial output
+        m = _JSON_RE_B.search(line)
+        if m:
+            process_json_message(m.group(1).decode('utf-8', errors='ignore'))
+        elif line.startswith(b'{'):
+            process_json_message(line.decode('utf-8', errors='ignore'))
     
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Check if it's a JSON line from serial output
-                if '[Piezo] JSON:' in line or '[TempHum] JSON:' in line:
-                    json_part = line.split('JSON:', 1)[1].strip()
-                    process_json_message(json_part)
-                elif line.startswith('{'):
-                    process_json_message(line)
+        with open(filename, 'rb', buffering=READ_BUFFER_SIZE) as f:
+            st = os.fstat(f.fileno())
+            if stat.S_ISREG(st.st_mode) and st.st_size:
+                # Scan the mapped file in place; only the JSON part of matching lines is decoded to text
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for line in iter(mm.readline, b''):
+                        handle_line(line)
+            else:
+                # Pipes/FIFOs (and empty files) can't be mapped: read lines from the buffered handle
+                for line in f:
+                    handle_line(line)
                     
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found")
@@ -226,7 +530,7 @@ def mqtt_mode():
     
     print(f"ESP32 Sensor Data Decoder - MQTT Mode")
     print(f"Connecting to {BROKER}:{PORT}")
-    print("=" * 60)
+    print(_BANNER)
     
     def on_connect(client, userdata, flags, rc):
         if rc == 0:
@@ -237,10 +541,37 @@ def mqtt_mode():
         else:
             print(f"✗ Connection failed with code {rc}")
     
+    # Decode on one worker thread so the network loop never stalls on a message;
+    # a single thread also keeps printed output whole and bursts in arrival order
+    messages = queue.SimpleQueue()
+    
+    def worker():
+        while True:
+            # Collect a burst: up to MQTT_BATCH_SIZE messages or MQTT_BATCH_WINDOW seconds
+            batch = [messages.get()]
+            deadline = time.monotonic() + MQTT_BATCH_WINDOW
+            while len(batch) < MQTT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(messages.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                process_json_batch(
+                    [payload.decode('utf-8', errors='ignore') for _, payload in batch],
+                    labels=[f"\n{_BANNER}\nTopic: {topic}" for topic, _ in batch]
+                )
+            except Exception as e:
+                # Keep the decoder alive; an unhandled error would silently stop MQTT decoding
+                print(f"Error processing MQTT messages: {e}")
+    
+    threading.Thread(target=worker, daemon=True).start()
+    
     def on_message(client, userdata, msg):
-        print(f"\n{'='*60}")
-        print(f"Topic: {msg.topic}")
-        process_json_message(msg.payload.decode())
+        messages.put((msg.topic, msg.payload))
     
     client = mqtt.Client()
     client.on_connect = on_connect
@@ -266,31 +597,52 @@ def serial_mode(port='COM9', baudrate=115200):
     
     print(f"ESP32 Sensor Data Decoder - Serial Mode")
     print(f"Connecting to {port} @ {baudrate} baud")
-    print("=" * 60)
+    print(_BANNER)
     
     try:
         ser = serial.Serial(port, baudrate, timeout=1)
         print(f"✓ Connected to {port}")
         print("Waiting for data...\n")
         
+        buffer = bytearray()
         while True:
             try:
-                line = ser.readline().decode('utf-8', errors='ignore').strip()
+                # Pull everything already received in one read (waits up to
+                # the port timeout for at least one byte)
+                scanned = len(buffer)  # the carried tail has no newline
+                buffer += ser.read(max(1, ser.in_waiting))
                 
-                if not line:
-                    continue
+                # Take off complete lines, keep the partial tail for next read
+                lines = []
+                start = 0
+                end = buffer.find(b'\n', scanned)
+                while end != -1:
+                    lines.append(bytes(buffer[start:end]))
+                    start = end + 1
+                    end = buffer.find(b'\n', start)
+                del buffer[:start]
                 
-                # Look for JSON data in serial output
-                if '[Piezo] JSON:' in line or '[TempHum] JSON:' in line:
-                    # Extract JSON part
-                    json_part = line.split('JSON:', 1)[1].strip()
-                    process_json_message(json_part)
-                elif line.startswith('{') and 'base64_sensordata' in line:
-                    # Direct JSON line
-                    process_json_message(line)
-                else:
-                    # Print other serial output for debugging
-                    if any(keyword in line for keyword in ['[Modem]', '[TimeSync]', '[Setup]', '[Core', '[Piezo]', '[TempHum]']):
+                # No newline for too long (e.g. wrong baud rate): drop the tail
+                # instead of buffering it forever
+                if len(buffer) > SERIAL_MAX_LINE:
+                    print(f"Discarding {len(buffer)} bytes without a line break")
+                    buffer.clear()
+                
+                for raw_line in lines:
+                    line = raw_line.decode('utf-8', errors='ignore').strip()
+                    
+                    if not line:
+                        continue
+                    
+                    # Look for JSON data in serial output
+                    m = _JSON_RE.search(line)
+                    if m:
+                        process_json_message(m.group(1))
+                    elif line.startswith('{') and 'base64_sensordata' in line:
+                        # Direct JSON line
+                        process_json_message(line)
+                    elif line.startswith(_DEBUG_TAGS):
+                        # Print other serial output for debugging
                         print(line)
                         
             except KeyboardInterrupt: